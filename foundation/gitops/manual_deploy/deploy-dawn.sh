@@ -56,8 +56,8 @@ else
 fi
 
 echo "Applying Dawn manifests (prod + rc)..."
-kubectl apply -f $TEMP_DIR/dawn/prod/
-kubectl apply -f $TEMP_DIR/dawn/rc/
+# Single apply for both tiers: one kubectl run, one API discovery pass
+kubectl apply -f $TEMP_DIR/dawn/prod/ -f $TEMP_DIR/dawn/rc/
 
 echo ""
 echo "Waiting for Dawn deployments to be ready..."
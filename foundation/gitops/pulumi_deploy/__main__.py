@@ -16,8 +16,17 @@ Separation of Concerns:
 - Application team manages: foundation/gitops/pulumi_deploy/ (this file)
 """
 
+import json
+import os
+import time
+from pathlib import Path
+from types import MappingProxyType
+
 import pulumi
-import pulumi_kubernetes as k8s
+from pulumi_kubernetes import Provider
+from pulumi_kubernetes.core import v1 as corev1
+
+from service_app import ServiceApp
 
 # ============================================================================
 # Kubernetes Provider Setup - Get kubeconfig from infrastructure stack
@@ -25,50 +34,175 @@ import pulumi_kubernetes as k8s
 
 config = pulumi.Config()
 
+
+def _load_kubeconfig(infra_stack_name):
+    """
+    Return the kubeconfig output of the infrastructure stack.
+
+    With cache_kubeconfig enabled, the resolved value is written to a local
+    file and reused for kubeconfig_ttl seconds, skipping the Pulumi Cloud
+    state download and secret decryption on warm runs.
+    """
+    if not config.get_bool("cache_kubeconfig"):
+        return pulumi.StackReference(infra_stack_name).require_output("kubeconfig")
+
+    ttl = config.get_int("kubeconfig_ttl")
+    if ttl is None:
+        ttl = 300
+    cache_file = (
+        Path.home() / ".cache" / "pulumi-foundation"
+        / f"{infra_stack_name.replace('/', '_')}-kubeconfig.json"
+    )
+
+    if cache_file.exists() and time.time() - cache_file.stat().st_mtime < ttl:
+        # Secret like the stack output it stands in for, so the kubeconfig
+        # stays encrypted in this stack's state
+        return pulumi.Output.secret(json.loads(cache_file.read_text()))
+
+    def write_through(kubeconfig):
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # Created owner-only, never briefly readable under the default umask
+        fd = os.open(cache_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            os.fchmod(fd, 0o600)  # files left by older versions
+            f.write(json.dumps(kubeconfig))
+        return kubeconfig
+
+    infra_stack = pulumi.StackReference(infra_stack_name)
+    return infra_stack.require_output("kubeconfig").apply(write_through)
+
+
 # Option 1: Use stack reference to get kubeconfig from infrastructure stack
 # This is the recommended approach for production/CI-CD
 use_stack_reference = config.get_bool("use_stack_reference")
 if use_stack_reference is None:
     use_stack_reference = True  # Default to using stack reference
 
-if use_stack_reference:
+# Fast path: a kubeconfig file supplied by the environment (e.g. CI dry runs)
+# replaces the stack reference and its Pulumi Cloud round-trip entirely
+local_kubeconfig = os.environ.get("PULUMI_LOCAL_KUBECONFIG")
+if local_kubeconfig:
+    use_stack_reference = False
+
+# Server-side apply: a single PATCH per resource with apiserver-tracked field
+# ownership instead of a client-side GET + three-way-merge PATCH. Set
+# server_side_apply=false to fall back to client-side apply if SSA's
+# managedFields bookkeeping slows the program down. Like the rate limits
+# below, only used by the explicit provider (stack reference or
+# PULUMI_LOCAL_KUBECONFIG).
+server_side_apply = config.get_bool("server_side_apply")
+if server_side_apply is None:
+    server_side_apply = True
+
+# Client-side rate limit for the provider's API calls (provider default: 50
+# QPS, burst 120), raised so the concurrently registered resources aren't
+# throttled
+k8s_client_qps = config.get_int("k8s_client_qps")
+if k8s_client_qps is None:
+    k8s_client_qps = 100
+k8s_client_burst = config.get_int("k8s_client_burst")
+if k8s_client_burst is None:
+    k8s_client_burst = 200
+
+if local_kubeconfig:
+    # Secret so the file's credentials are encrypted in the stack state
+    kubeconfig = pulumi.Output.secret(Path(local_kubeconfig).expanduser().read_text())
+elif use_stack_reference:
     # Get the infrastructure stack name from config
     infra_stack_name = config.get("infra_stack_name") or "ry111/foundation/day"
 
-    # Create stack reference to infrastructure stack
-    infra_stack = pulumi.StackReference(infra_stack_name)
-
-    # Get kubeconfig output from infrastructure stack
-    kubeconfig = infra_stack.require_output("kubeconfig")
+    # Get kubeconfig output from infrastructure stack (via stack reference,
+    # or the local cache when cache_kubeconfig is enabled)
+    kubeconfig = _load_kubeconfig(infra_stack_name)
+else:
+    # Option 2: Use default kubeconfig (local development, CI with kubectl set up)
+    # Will use ~/.kube/config or KUBECONFIG environment variable
+    kubeconfig = None
 
-    # Create explicit Kubernetes provider using the kubeconfig from infra stack
-    k8s_provider = k8s.Provider(
+if kubeconfig is not None:
+    # Create explicit Kubernetes provider using the resolved kubeconfig
+    k8s_provider = Provider(
         "k8s-provider",
         kubeconfig=kubeconfig,
+        enable_server_side_apply=server_side_apply,
+        kube_client_settings={"qps": k8s_client_qps, "burst": k8s_client_burst},
     )
-
-    # Use this provider for all resources
-    provider_opts = pulumi.ResourceOptions(provider=k8s_provider)
 else:
-    # Option 2: Use default kubeconfig (local development)
-    # Will use ~/.kube/config or KUBECONFIG environment variable
-    provider_opts = None
+    # Default provider. Deliberately not replaced by an explicit one: moving
+    # existing resources from the default to an explicit provider replaces
+    # them (delete-before-replace for the fixed-name Namespace). Hence
+    # server_side_apply and k8s_client_qps/burst don't apply here; set
+    # kubernetes:enableServerSideApply in the stack config instead.
+    k8s_provider = None
+
+# Provider options, built once and shared by the resources declared here
+base_opts = pulumi.ResourceOptions(provider=k8s_provider)
 
 # ============================================================================
 # Configuration
 # ============================================================================
 
-# Base service name (configurable to support multiple services)
-service_name = config.get("service_name") or "day"
+# Defaults for every setting; any of them can be overridden per stack with
+# `pulumi config set <key> <value>`. The type of the default decides how the
+# stack value is parsed.
+DEFAULTS = {
+    # Base service name (configurable to support multiple services)
+    "service_name": "day",
+    # Container port (varies by service: day=8001, dusk=8002, dawn=8000)
+    "container_port": 8001,
+    # Cluster name (trantor or terminus)
+    "cluster_name": "trantor",
+    # Namespace configuration
+    "namespace": "production",
+    # Image configuration (image_name defaults to service_name)
+    "image_registry": "your-registry",
+    "image_tag": "latest",
+    "image_name": None,
+    # Deployment settings
+    "replicas": 3,
+    # Autoscaling settings
+    "min_replicas": 2,
+    "max_replicas": 10,
+    "cpu_target": 70,
+    "memory_target": 80,
+    # Resource settings
+    "cpu_request": "100m",
+    "memory_request": "128Mi",
+    "cpu_limit": "500m",
+    "memory_limit": "512Mi",
+    # Application configuration (environment variables)
+    "log_level": "INFO",
+    "database_host": "postgres.production.svc.cluster.local",
+    "cache_ttl": "300",
+    "feature_new_ui": True,
+}
+
+
+def _load_settings():
+    """Read every setting in DEFAULTS from stack config in a single pass."""
+    settings = {}
+    for key, default in DEFAULTS.items():
+        if isinstance(default, bool):
+            value = config.get_bool(key)
+        elif isinstance(default, int):
+            value = config.get_int(key)
+        else:
+            value = config.get(key)
+        # Explicit None check: `value or default` would turn a configured
+        # false (or 0) back into the default
+        settings[key] = default if value is None else value
+    return settings
+
 
-# Container port (varies by service: day=8001, dusk=8002, dawn=8000)
-container_port = config.get_int("container_port") or 8001
+cfg = _load_settings()
 
-# Cluster name (trantor or terminus)
-cluster_name = config.get("cluster_name") or "trantor"
+# ConfigMap values are strings; booleans use the lowercase form the apps expect
+BOOL_STR = {True: "true", False: "false"}
 
-# Namespace configuration
-namespace = config.get("namespace") or "production"
+service_name = cfg["service_name"]
+container_port = cfg["container_port"]
+cluster_name = cfg["cluster_name"]
+namespace = cfg["namespace"]
 
 # Determine tier based on namespace
 tier = "rc" if "rc" in namespace else "production"
@@ -76,60 +210,97 @@ tier = "rc" if "rc" in namespace else "production"
 # Resource naming (matches manual deploy pattern)
 # Production: day, day-service, day-ingress, day-config, day-hpa
 # RC: day-rc, day-rc-service, day-rc-ingress, day-rc-config, day-rc-hpa
-deployment_name = f"{service_name}-{tier}" if tier == "rc" else service_name
-service_resource_name = f"{service_name}-{tier}-service" if tier == "rc" else f"{service_name}-service"
-ingress_name = f"{service_name}-{tier}-ingress" if tier == "rc" else f"{service_name}-ingress"
-configmap_name = f"{service_name}-{tier}-config" if tier == "rc" else f"{service_name}-config"
-hpa_name = f"{service_name}-{tier}-hpa" if tier == "rc" else f"{service_name}-hpa"
+name_suffix = f"-{tier}" if tier == "rc" else ""
+deployment_name = f"{service_name}{name_suffix}"
+service_resource_name = f"{deployment_name}-service"
+ingress_name = f"{deployment_name}-ingress"
+configmap_name = f"{deployment_name}-config"
+hpa_name = f"{deployment_name}-hpa"
 
 # Ingress host configuration
-ingress_host = f"{service_name}-{tier}.example.com" if tier == "rc" else f"{service_name}.example.com"
-
-# Image configuration
-image_registry = config.get("image_registry") or "your-registry"
-image_tag = config.get("image_tag") or "latest"
-image_name = config.get("image_name") or service_name  # ECR repository name
-
-# Deployment settings
-replicas = config.get_int("replicas") or 3
-
-# Autoscaling settings
-min_replicas = config.get_int("min_replicas") or 2
-max_replicas = config.get_int("max_replicas") or 10
-cpu_target = config.get_int("cpu_target") or 70
-memory_target = config.get_int("memory_target") or 80
-
-# Resource settings
-cpu_request = config.get("cpu_request") or "100m"
-memory_request = config.get("memory_request") or "128Mi"
-cpu_limit = config.get("cpu_limit") or "500m"
-memory_limit = config.get("memory_limit") or "512Mi"
-
-# Application configuration (environment variables)
-log_level = config.get("log_level") or "INFO"
-database_host = config.get("database_host") or "postgres.production.svc.cluster.local"
-cache_ttl = config.get("cache_ttl") or "300"
-feature_new_ui = config.get_bool("feature_new_ui") or True
+ingress_host = f"{deployment_name}.example.com"
+
+image_registry = cfg["image_registry"]
+image_tag = cfg["image_tag"]
+image_name = cfg["image_name"] or service_name  # ECR repository name
+
+replicas = cfg["replicas"]
+
+min_replicas = cfg["min_replicas"]
+max_replicas = cfg["max_replicas"]
+cpu_target = cfg["cpu_target"]
+memory_target = cfg["memory_target"]
+
+cpu_request = cfg["cpu_request"]
+memory_request = cfg["memory_request"]
+cpu_limit = cfg["cpu_limit"]
+memory_limit = cfg["memory_limit"]
+
+log_level = cfg["log_level"]
+database_host = cfg["database_host"]
+cache_ttl = cfg["cache_ttl"]
+feature_new_ui = cfg["feature_new_ui"]
+
+# ============================================================================
+# Container Spec
+# ============================================================================
+# Fully determined by configuration, so built once here and handed to the
+# component as-is
+
+RESOURCES = MappingProxyType({
+    "requests": {
+        "cpu": cpu_request,
+        "memory": memory_request,
+    },
+    "limits": {
+        "cpu": cpu_limit,
+        "memory": memory_limit,
+    },
+})
+
+# /health is a trivial handler: poll readiness often so new pods join the
+# Service quickly, and keep liveness infrequent once the pod is up
+LIVENESS_PROBE = MappingProxyType({
+    "http_get": {
+        "path": "/health",
+        "port": container_port,  # Match service port
+    },
+    "initial_delay_seconds": 10,
+    "period_seconds": 15,
+})
+
+READINESS_PROBE = MappingProxyType({
+    "http_get": {
+        "path": "/health",  # Use /health instead of /ready
+        "port": container_port,  # Match service port
+    },
+    "initial_delay_seconds": 1,
+    "period_seconds": 2,
+    "timeout_seconds": 1,
+    "success_threshold": 1,
+    "failure_threshold": 3,
+})
 
 # ============================================================================
 # Labels and Metadata
 # ============================================================================
 
 # Pod labels (include all labels for identification)
-pod_labels = {
+POD_LABELS = MappingProxyType({
     "app": service_name,
     "tier": tier,
     "cluster": cluster_name,
-}
+})
 
 # Resource metadata labels (for deployments, services, etc.)
-labels = {
+# Read-only so the single shared instance can't be mutated by one resource
+LABELS = MappingProxyType({
     "app": service_name,
     "managed-by": "pulumi",
     "environment": namespace,
     "tier": tier,
     "cluster": cluster_name,
-}
+})
 
 # ============================================================================
 # Namespace
@@ -137,7 +308,7 @@ labels = {
 # Create the namespace if it doesn't exist
 # This allows the application stack to be self-contained
 
-ns = k8s.core.v1.Namespace(
+ns = corev1.Namespace(
     f"{namespace}-namespace",
     metadata={
         "name": namespace,
@@ -150,255 +321,84 @@ ns = k8s.core.v1.Namespace(
             "environment": "production" if tier == "production" else "rc",
         },
     },
-    opts=provider_opts,
+    opts=base_opts,
 )
 
 # ============================================================================
-# ConfigMap
+# Application Resources
 # ============================================================================
 
-config_map = k8s.core.v1.ConfigMap(
-    f"{configmap_name}-configmap",
-    metadata={
-        "name": configmap_name,
-        "namespace": namespace,
-        "labels": labels,
+app = ServiceApp(
+    f"{deployment_name}-app",
+    service_name=service_name,
+    tier=tier,
+    cluster_name=cluster_name,
+    # Referencing the namespace through its Output gives every resource a
+    # data dependency on it, so no explicit depends_on is needed
+    namespace=ns.metadata["name"],
+    labels=LABELS,
+    pod_labels=POD_LABELS,
+    names={
+        "deployment": deployment_name,
+        "service": service_resource_name,
+        "ingress": ingress_name,
+        "configmap": configmap_name,
+        "hpa": hpa_name,
     },
-    data={
+    image=f"{image_registry}/{image_name}:{image_tag}",
+    container_port=container_port,
+    config_data={
         "LOG_LEVEL": log_level,
         "DATABASE_HOST": database_host,
         "CACHE_TTL": cache_ttl,
-        "FEATURE_NEW_UI": str(feature_new_ui).lower(),
+        "FEATURE_NEW_UI": BOOL_STR[feature_new_ui],
     },
-    opts=pulumi.ResourceOptions(
-        provider=provider_opts.provider if provider_opts else None,
-        depends_on=[ns],  # Wait for namespace to be created
-    ),
-)
-
-# ============================================================================
-# Deployment
-# ============================================================================
-
-# Deployment selector (matches manual deploy pattern)
-# Production: only app label
-# RC: app + tier labels
-deployment_selector = {"app": service_name}
-if tier == "rc":
-    deployment_selector["tier"] = tier
-
-deployment = k8s.apps.v1.Deployment(
-    f"{deployment_name}-deployment",
-    metadata={
-        "name": deployment_name,
-        "namespace": namespace,
-        "labels": labels,
-    },
-    spec={
-        # "replicas": replicas,  # Commented out to allow HPA to manage replicas
-        "selector": {
-            "match_labels": deployment_selector,
-        },
-        "template": {
-            "metadata": {
-                "labels": pod_labels,
-            },
-            "spec": {
-                "containers": [{
-                    "name": service_name,
-                    "image": f"{image_registry}/{image_name}:{image_tag}",
-                    "ports": [{
-                        "container_port": container_port,  # Match Dockerfile EXPOSE port
-                        "name": "http",
-                    }],
-                    "env_from": [{
-                        "config_map_ref": {
-                            "name": config_map.metadata["name"],
-                        },
-                    }],
-                    "resources": {
-                        "requests": {
-                            "cpu": cpu_request,
-                            "memory": memory_request,
-                        },
-                        "limits": {
-                            "cpu": cpu_limit,
-                            "memory": memory_limit,
-                        },
-                    },
-                    "liveness_probe": {
-                        "http_get": {
-                            "path": "/health",
-                            "port": container_port,  # Match service port
-                        },
-                        "initial_delay_seconds": 30,
-                        "period_seconds": 10,
-                    },
-                    "readiness_probe": {
-                        "http_get": {
-                            "path": "/health",  # Use /health instead of /ready
-                            "port": container_port,  # Match service port
-                        },
-                        "initial_delay_seconds": 5,
-                        "period_seconds": 5,
-                    },
-                }],
-            },
-        },
-    },
-    opts=pulumi.ResourceOptions(
-        provider=provider_opts.provider if provider_opts else None,
-        depends_on=[ns],  # Wait for namespace to be created
-    ),
-)
-
-# ============================================================================
-# Service
-# ============================================================================
-
-# Service selector (matches manual deploy pattern and deployment selector)
-# Production: only app label
-# RC: app + tier labels
-service_selector = {"app": service_name}
-if tier == "rc":
-    service_selector["tier"] = tier
-
-service = k8s.core.v1.Service(
-    f"{service_resource_name}-k8s-service",
-    metadata={
-        "name": service_resource_name,
-        "namespace": namespace,
-        "labels": labels,
-    },
-    spec={
-        "type": "ClusterIP",
-        "selector": service_selector,
-        "ports": [{
-            "port": 80,
-            "target_port": container_port,  # Match container port
-            "protocol": "TCP",
-            "name": "http",
-        }],
-    },
-    opts=pulumi.ResourceOptions(
-        provider=provider_opts.provider if provider_opts else None,
-        depends_on=[ns],  # Wait for namespace to be created
-    ),
-)
-
-# ============================================================================
-# HorizontalPodAutoscaler
-# ============================================================================
-
-hpa = k8s.autoscaling.v2.HorizontalPodAutoscaler(
-    f"{hpa_name}-resource",
-    metadata={
-        "name": hpa_name,
-        "namespace": namespace,
-        "labels": labels,
-    },
-    spec={
-        "scale_target_ref": {
-            "api_version": "apps/v1",
-            "kind": "Deployment",
-            "name": deployment_name,
-        },
-        "min_replicas": min_replicas,
-        "max_replicas": max_replicas,
-        "metrics": [
-            {
-                "type": "Resource",
-                "resource": {
-                    "name": "cpu",
-                    "target": {
-                        "type": "Utilization",
-                        "average_utilization": cpu_target,
-                    },
-                },
-            },
-            {
-                "type": "Resource",
-                "resource": {
-                    "name": "memory",
-                    "target": {
-                        "type": "Utilization",
-                        "average_utilization": memory_target,
-                    },
-                },
-            },
-        ],
-    },
-    opts=pulumi.ResourceOptions(
-        provider=provider_opts.provider if provider_opts else None,
-        depends_on=[ns],  # Wait for namespace to be created
-    ),
-)
-
-# ============================================================================
-# Ingress
-# ============================================================================
-
-ingress = k8s.networking.v1.Ingress(
-    f"{ingress_name}-resource",
-    metadata={
-        "name": ingress_name,
-        "namespace": namespace,
-        "labels": labels,
-        "annotations": {
-            # AWS Load Balancer Controller annotations
-            "kubernetes.io/ingress.class": "alb",
-            "alb.ingress.kubernetes.io/group.name": f"{cluster_name}-cluster",
-            "alb.ingress.kubernetes.io/scheme": "internet-facing",
-            "alb.ingress.kubernetes.io/target-type": "ip",
-            "alb.ingress.kubernetes.io/healthcheck-path": "/health",
-        },
-    },
-    spec={
-        "rules": [{
-            "host": ingress_host,  # CRITICAL: Add host for shared ALB routing
-            "http": {
-                "paths": [{
-                    "path": "/",
-                    "path_type": "Prefix",
-                    "backend": {
-                        "service": {
-                            "name": service_resource_name,
-                            "port": {
-                                "number": 80,
-                            },
-                        },
-                    },
-                }],
-            },
-        }],
-    },
-    opts=pulumi.ResourceOptions(
-        provider=provider_opts.provider if provider_opts else None,
-        depends_on=[ns],  # Wait for namespace to be created
-    ),
+    resources=RESOURCES,
+    liveness_probe=LIVENESS_PROBE,
+    readiness_probe=READINESS_PROBE,
+    min_replicas=min_replicas,
+    max_replicas=max_replicas,
+    cpu_target=cpu_target,
+    memory_target=memory_target,
+    ingress_host=ingress_host,
+    provider=k8s_provider,
+    # The namespace is the component's parent, which orders it before the
+    # application resources
+    opts=pulumi.ResourceOptions(parent=ns),
 )
 
 # ============================================================================
 # Outputs
 # ============================================================================
 
-pulumi.export("deployment_name", deployment.metadata["name"])
-pulumi.export("service_name", service.metadata["name"])
-pulumi.export("hpa_name", hpa.metadata["name"])
-pulumi.export("ingress_name", ingress.metadata["name"])
-pulumi.export("configmap_name", config_map.metadata["name"])
+pulumi.export("deployment_name", app.deployment_name)
+pulumi.export("service_name", app.service_name)
+pulumi.export("hpa_name", app.hpa_name)
+pulumi.export("configmap_name", app.configmap_name)
 pulumi.export("namespace", namespace)
 pulumi.export("tier", tier)
 pulumi.export("replicas", replicas)
 pulumi.export("image", f"{image_registry}/{image_name}:{image_tag}")
 pulumi.export("ingress_host", ingress_host)
 
-# Export ALB hostname once ingress is created
-pulumi.export("alb_hostname", ingress.status.apply(
-    lambda status: status.load_balancer.ingress[0].hostname
-    if status and status.load_balancer and status.load_balancer.ingress
-    else "pending"
-))
+
+def _alb_hostname(status):
+    """ALB DNS name from an Ingress status, or "pending" until it is assigned."""
+    try:
+        return status.load_balancer.ingress[0].hostname
+    except (AttributeError, IndexError, TypeError):
+        return "pending"
+
+
+# Ingress name and ALB hostname (once the ingress is created), resolved
+# together in a single apply
+ingress_info = pulumi.Output.all(app.ingress_name, app.ingress.status).apply(
+    lambda args: {"name": args[0], "hostname": _alb_hostname(args[1])}
+)
+pulumi.export("ingress", ingress_info)
+
+# Kept for scripts that read the hostname directly
+pulumi.export("alb_hostname", ingress_info["hostname"])
 
 # Export which provider mode is being used
 pulumi.export("using_stack_reference", use_stack_reference)
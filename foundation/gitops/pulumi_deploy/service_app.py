@@ -0,0 +1,284 @@
+"""
+ServiceApp component for the gitops Pulumi program.
+
+Kept in its own module so Python compiles it once to bytecode and reuses the
+cached .pyc across preview/up runs; __main__.py only reads configuration and
+instantiates the component.
+"""
+
+from types import MappingProxyType
+
+import pulumi
+from pulumi_kubernetes.apps import v1 as appsv1
+from pulumi_kubernetes.autoscaling import v2 as autoscalingv2
+from pulumi_kubernetes.core import v1 as corev1
+from pulumi_kubernetes.networking import v1 as networkingv1
+
+# AWS Load Balancer Controller annotations shared by every service Ingress
+# (the per-cluster group.name is added per instance)
+ALB_ANNOTATIONS = MappingProxyType({
+    "kubernetes.io/ingress.class": "alb",
+    "alb.ingress.kubernetes.io/scheme": "internet-facing",
+    "alb.ingress.kubernetes.io/target-type": "ip",
+    "alb.ingress.kubernetes.io/healthcheck-path": "/health",
+})
+
+# Scale up as soon as the metrics cross the target (up to doubling every 15s)
+# and scale down after 1 minute instead of the default 5 minute window
+HPA_BEHAVIOR = MappingProxyType({
+    "scale_up": {
+        "stabilization_window_seconds": 0,
+        "policies": [{"type": "Percent", "value": 100, "period_seconds": 15}],
+    },
+    "scale_down": {
+        "stabilization_window_seconds": 60,
+        "policies": [{"type": "Percent", "value": 50, "period_seconds": 60}],
+    },
+})
+
+# ConfigMap and HPA are plain API objects with no readiness to await; fail
+# fast instead of sitting in the provider's default await window. (The Service
+# is excluded: the provider waits for its endpoints, i.e. for the Deployment's
+# pods to become Ready, which can take minutes on an image pull or node
+# scale-up.)
+FAST_TIMEOUTS = pulumi.CustomTimeouts(create="60s", update="60s", delete="30s")
+
+
+class ServiceApp(pulumi.ComponentResource):
+    """
+    ConfigMap, Deployment, Service, HPA and Ingress for one service tier.
+
+    The children only depend on the component (and through it on the
+    namespace), so the engine can register the siblings concurrently.
+
+    names maps "deployment", "service", "ingress", "configmap" and "hpa" to
+    the Kubernetes object names.
+    """
+
+    def __init__(
+        self,
+        name,
+        *,
+        service_name,
+        tier,
+        cluster_name,
+        namespace,
+        labels,
+        pod_labels,
+        names,
+        image,
+        container_port,
+        config_data,
+        resources,
+        liveness_probe,
+        readiness_probe,
+        min_replicas,
+        max_replicas,
+        cpu_target,
+        memory_target,
+        ingress_host,
+        provider=None,
+        opts=None,
+    ):
+        super().__init__("foundation:gitops:ServiceApp", name, None, opts)
+
+        self._namespace = namespace
+        self._labels = labels
+
+        child_opts = pulumi.ResourceOptions(parent=self, provider=provider)
+
+        def opts_for(legacy_name, **extra):
+            # Children use short canonical names (the component type is part
+            # of the URN). Resources were previously registered at the stack
+            # root under longer names; alias them so existing stacks migrate
+            # without a delete+create cycle.
+            return pulumi.ResourceOptions.merge(
+                child_opts,
+                pulumi.ResourceOptions(aliases=[
+                    pulumi.Alias(name=legacy_name, parent=pulumi.ROOT_STACK_RESOURCE),
+                ], **extra),
+            )
+
+        # --------------------------------------------------------------------
+        # ConfigMap
+        # --------------------------------------------------------------------
+
+        self.config_map = corev1.ConfigMap(
+            "configmap",
+            metadata=self._meta(names["configmap"]),
+            data=config_data,
+            opts=opts_for(f"{names['configmap']}-configmap", custom_timeouts=FAST_TIMEOUTS),
+        )
+        # Resolved object names, read once and shared by the Deployment spec,
+        # register_outputs and the stack exports
+        self.configmap_name = self.config_map.metadata["name"]
+
+        # --------------------------------------------------------------------
+        # Deployment
+        # --------------------------------------------------------------------
+
+        # Pod selector shared by the Deployment and the Service
+        # (matches manual deploy pattern)
+        # Production: only app label
+        # RC: app + tier labels
+        selector = {"app": service_name}
+        if tier == "rc":
+            selector["tier"] = tier
+        selector = MappingProxyType(selector)
+
+        self.deployment = appsv1.Deployment(
+            "deployment",
+            metadata=self._meta(names["deployment"]),
+            spec={
+                # "replicas": replicas,  # Commented out to allow HPA to manage replicas
+                "selector": {
+                    "match_labels": selector,
+                },
+                "template": {
+                    "metadata": {
+                        "labels": pod_labels,
+                    },
+                    "spec": {
+                        "containers": [{
+                            "name": service_name,
+                            "image": image,
+                            "ports": [{
+                                "container_port": container_port,  # Match Dockerfile EXPOSE port
+                                "name": "http",
+                            }],
+                            "env_from": [{
+                                "config_map_ref": {
+                                    "name": self.configmap_name,
+                                },
+                            }],
+                            "resources": resources,
+                            "liveness_probe": liveness_probe,
+                            "readiness_probe": readiness_probe,
+                        }],
+                    },
+                },
+            },
+            opts=pulumi.ResourceOptions.merge(
+                opts_for(f"{names['deployment']}-deployment"),
+                # Annotations are written by the deployment controller and by
+                # `kubectl rollout restart`, never by this program; don't let
+                # that drift trigger a PATCH on every up
+                pulumi.ResourceOptions(ignore_changes=[
+                    "metadata.annotations",
+                    "spec.template.metadata.annotations",
+                ]),
+            ),
+        )
+        self.deployment_name = self.deployment.metadata["name"]
+
+        # --------------------------------------------------------------------
+        # Service
+        # --------------------------------------------------------------------
+
+        self.service = corev1.Service(
+            "service",
+            metadata=self._meta(names["service"]),
+            spec={
+                "type": "ClusterIP",
+                "selector": selector,
+                "ports": [{
+                    "port": 80,
+                    "target_port": container_port,  # Match container port
+                    "protocol": "TCP",
+                    "name": "http",
+                }],
+            },
+            opts=opts_for(f"{names['service']}-k8s-service"),
+        )
+        self.service_name = self.service.metadata["name"]
+
+        # --------------------------------------------------------------------
+        # HorizontalPodAutoscaler
+        # --------------------------------------------------------------------
+
+        self.hpa = autoscalingv2.HorizontalPodAutoscaler(
+            "hpa",
+            metadata=self._meta(names["hpa"]),
+            spec={
+                "scale_target_ref": {
+                    "api_version": "apps/v1",
+                    "kind": "Deployment",
+                    "name": names["deployment"],
+                },
+                "min_replicas": min_replicas,
+                "max_replicas": max_replicas,
+                "behavior": HPA_BEHAVIOR,
+                "metrics": [
+                    {
+                        "type": "Resource",
+                        "resource": {
+                            "name": "cpu",
+                            "target": {
+                                "type": "Utilization",
+                                "average_utilization": cpu_target,
+                            },
+                        },
+                    },
+                    {
+                        "type": "Resource",
+                        "resource": {
+                            "name": "memory",
+                            "target": {
+                                "type": "Utilization",
+                                "average_utilization": memory_target,
+                            },
+                        },
+                    },
+                ],
+            },
+            opts=opts_for(f"{names['hpa']}-resource", custom_timeouts=FAST_TIMEOUTS),
+        )
+        self.hpa_name = self.hpa.metadata["name"]
+
+        # --------------------------------------------------------------------
+        # Ingress
+        # --------------------------------------------------------------------
+
+        self.ingress = networkingv1.Ingress(
+            "ingress",
+            metadata={
+                **self._meta(names["ingress"]),
+                "annotations": {
+                    **ALB_ANNOTATIONS,
+                    "alb.ingress.kubernetes.io/group.name": f"{cluster_name}-cluster",
+                },
+            },
+            spec={
+                "rules": [{
+                    "host": ingress_host,  # CRITICAL: Add host for shared ALB routing
+                    "http": {
+                        "paths": [{
+                            "path": "/",
+                            "path_type": "Prefix",
+                            "backend": {
+                                "service": {
+                                    "name": names["service"],
+                                    "port": {
+                                        "number": 80,
+                                    },
+                                },
+                            },
+                        }],
+                    },
+                }],
+            },
+            opts=opts_for(f"{names['ingress']}-resource"),
+        )
+        self.ingress_name = self.ingress.metadata["name"]
+
+        self.register_outputs({
+            "deployment_name": self.deployment_name,
+            "service_name": self.service_name,
+            "hpa_name": self.hpa_name,
+            "ingress_name": self.ingress_name,
+            "configmap_name": self.configmap_name,
+        })
+
+    def _meta(self, name):
+        """Metadata shared by every namespaced application resource."""
+        return {"name": name, "namespace": self._namespace, "labels": self._labels}
@@ -12,11 +12,16 @@ Supports Terminus cluster via stack configuration.
 Note: Trantor cluster is managed manually via eksctl scripts.
 """
 
+import ipaddress
+import itertools
+
 import pulumi
 import pulumi_aws as aws
 import pulumi_eks as eks
 import pulumi_kubernetes as k8s
 
+from alb_policy import ALB_POLICY_JSON
+
 # Configuration
 config = pulumi.Config()
 aws_config = pulumi.Config("aws")
@@ -29,7 +34,27 @@ min_nodes = config.get_int("min_nodes") or 1
 max_nodes = config.get_int("max_nodes") or 3
 desired_nodes = config.get_int("desired_nodes") or 2
 instance_type = config.get("instance_type") or "t3.small"
-use_spot = config.get_bool("use_spot") or True
+use_spot = config.get_bool("use_spot")
+if use_spot is None:
+    use_spot = True  # Default to spot instances
+
+# Server-side apply for in-cluster resources (pulumi-kubernetes default);
+# set server_side_apply=false to fall back to client-side apply
+server_side_apply = config.get_bool("server_side_apply")
+if server_side_apply is None:
+    server_side_apply = True
+
+# Block `pulumi up` until the ALB controller chart's resources are ready
+# (off by default: nothing in this stack needs the controller running)
+wait_alb = config.get_bool("wait_alb")
+if wait_alb is None:
+    wait_alb = False
+
+# Pinned ALB controller chart version; an unpinned Release re-resolves the
+# latest chart from the repository index on every preview/up. Required (no
+# default) so a stack never silently moves the controller to another chart:
+# set it to the deployed version (`helm list -n kube-system`).
+alb_chart_version = config.require("alb_chart_version")
 
 project_name = pulumi.get_project()
 stack_name = pulumi.get_stack()
@@ -42,27 +67,44 @@ common_tags = {
     "Cluster": cluster_name,
 }
 
+
+def _tags(name, extra=None):
+    """common_tags plus a Name tag (and any extra tags) in a single dict."""
+    return {**common_tags, "Name": name, **(extra or {})}
+
+
 # Create VPC for EKS cluster
 vpc = aws.ec2.Vpc(
     f"{cluster_name}-vpc",
     cidr_block=vpc_cidr,
     enable_dns_hostnames=True,
     enable_dns_support=True,
-    tags={**common_tags, "Name": f"{cluster_name}-vpc-{stack_name}"},
+    tags=_tags(f"{cluster_name}-vpc-{stack_name}"),
 )
 
 # Internet Gateway
 igw = aws.ec2.InternetGateway(
     f"{cluster_name}-igw",
     vpc_id=vpc.id,
-    tags={**common_tags, "Name": f"{cluster_name}-igw-{stack_name}"},
+    tags=_tags(f"{cluster_name}-igw-{stack_name}"),
 )
 
 # Calculate subnet CIDRs from VPC CIDR
-# For 10.x.0.0/16, subnets will be 10.x.1.0/24 and 10.x.2.0/24
-vpc_cidr_parts = vpc_cidr.split('.')
-subnet_1_cidr = f"{vpc_cidr_parts[0]}.{vpc_cidr_parts[1]}.1.0/24"
-subnet_2_cidr = f"{vpc_cidr_parts[0]}.{vpc_cidr_parts[1]}.2.0/24"
+# Second and third /24 of the VPC range: for 10.x.0.0/16, subnets will be
+# 10.x.1.0/24 and 10.x.2.0/24. Needs a network address (no host bits set)
+# and a range of /22 or wider.
+try:
+    vpc_network = ipaddress.ip_network(vpc_cidr)
+except ValueError as e:
+    raise pulumi.RunError(f"vpc_cidr {vpc_cidr!r} is not a valid network: {e}") from e
+if vpc_network.prefixlen > 22:
+    raise pulumi.RunError(
+        f"vpc_cidr {vpc_cidr!r} is too small: the public subnets need its "
+        "second and third /24, so use a /22 or wider range"
+    )
+subnet_1_cidr, subnet_2_cidr = (
+    str(subnet) for subnet in itertools.islice(vpc_network.subnets(new_prefix=24), 1, 3)
+)
 
 # Public subnets for ALB
 public_subnet_1 = aws.ec2.Subnet(
@@ -71,11 +113,10 @@ public_subnet_1 = aws.ec2.Subnet(
     cidr_block=subnet_1_cidr,
     availability_zone=f"{region}a",
     map_public_ip_on_launch=True,
-    tags={
-        **common_tags,
-        "Name": f"{cluster_name}-public-subnet-1-{stack_name}",
-        "kubernetes.io/role/elb": "1",  # Required for ALB
-    },
+    tags=_tags(
+        f"{cluster_name}-public-subnet-1-{stack_name}",
+        {"kubernetes.io/role/elb": "1"},  # Required for ALB
+    ),
 )
 
 public_subnet_2 = aws.ec2.Subnet(
@@ -84,24 +125,21 @@ public_subnet_2 = aws.ec2.Subnet(
     cidr_block=subnet_2_cidr,
     availability_zone=f"{region}b",
     map_public_ip_on_launch=True,
-    tags={
-        **common_tags,
-        "Name": f"{cluster_name}-public-subnet-2-{stack_name}",
-        "kubernetes.io/role/elb": "1",
-    },
+    tags=_tags(
+        f"{cluster_name}-public-subnet-2-{stack_name}",
+        {"kubernetes.io/role/elb": "1"},
+    ),
 )
 
 # Route table for public subnets
 public_route_table = aws.ec2.RouteTable(
     f"{cluster_name}-public-rt",
     vpc_id=vpc.id,
-    routes=[
-        aws.ec2.RouteTableRouteArgs(
-            cidr_block="0.0.0.0/0",
-            gateway_id=igw.id,
-        )
-    ],
-    tags={**common_tags, "Name": f"{cluster_name}-public-rt-{stack_name}"},
+    routes=[{
+        "cidr_block": "0.0.0.0/0",
+        "gateway_id": igw.id,
+    }],
+    tags=_tags(f"{cluster_name}-public-rt-{stack_name}"),
 )
 
 public_rt_association_1 = aws.ec2.RouteTableAssociation(
@@ -124,7 +162,7 @@ cluster = eks.Cluster(
     public_subnet_ids=[public_subnet_1.id, public_subnet_2.id],
     skip_default_node_group=True,  # We'll create managed node group separately
     create_oidc_provider=True,  # Required for ALB controller
-    tags={**common_tags, "Name": cluster_name},
+    tags=_tags(cluster_name),
 )
 
 # Create managed node group with spot instances
@@ -135,18 +173,25 @@ node_group = aws.eks.NodeGroup(
     subnet_ids=[public_subnet_1.id, public_subnet_2.id],
     capacity_type="SPOT" if use_spot else "ON_DEMAND",
     instance_types=[instance_type],
-    scaling_config=aws.eks.NodeGroupScalingConfigArgs(
-        desired_size=desired_nodes,
-        min_size=min_nodes,
-        max_size=max_nodes,
-    ),
-    tags={**common_tags, "Name": f"{cluster_name}-node-group"},
+    scaling_config={
+        "desired_size": desired_nodes,
+        "min_size": min_nodes,
+        "max_size": max_nodes,
+    },
+    tags=_tags(f"{cluster_name}-node-group"),
 )
 
 # Create Kubernetes provider using the cluster's kubeconfig
 k8s_provider = k8s.Provider(
     f"{cluster_name}-k8s",
     kubeconfig=cluster.kubeconfig,
+    enable_server_side_apply=server_side_apply,
+)
+
+# Shared options for in-cluster resources, built once
+k8s_opts = pulumi.ResourceOptions(
+    provider=k8s_provider,
+    depends_on=[cluster],
 )
 
 # Get the OIDC provider URL and ARN for ALB controller IAM role
@@ -155,150 +200,29 @@ oidc_provider_arn = cluster.core.oidc_provider.arn
 
 # Create IAM policy for ALB controller
 # This policy allows the controller to manage ALBs
-alb_policy_doc = aws.iam.get_policy_document(
-    statements=[
-        # EC2 permissions
-        aws.iam.GetPolicyDocumentStatementArgs(
-            effect="Allow",
-            actions=[
-                "ec2:DescribeAccountAttributes",
-                "ec2:DescribeAddresses",
-                "ec2:DescribeAvailabilityZones",
-                "ec2:DescribeInternetGateways",
-                "ec2:DescribeVpcs",
-                "ec2:DescribeSubnets",
-                "ec2:DescribeSecurityGroups",
-                "ec2:DescribeInstances",
-                "ec2:DescribeNetworkInterfaces",
-                "ec2:DescribeTags",
-                "ec2:CreateTags",
-                "ec2:DeleteTags",
-                "ec2:CreateSecurityGroup",
-                "ec2:DeleteSecurityGroup",
-                "ec2:AuthorizeSecurityGroupIngress",
-                "ec2:RevokeSecurityGroupIngress",
-            ],
-            resources=["*"],
-        ),
-        # ELB permissions
-        aws.iam.GetPolicyDocumentStatementArgs(
-            effect="Allow",
-            actions=[
-                "elasticloadbalancing:DescribeLoadBalancers",
-                "elasticloadbalancing:DescribeLoadBalancerAttributes",
-                "elasticloadbalancing:DescribeListeners",
-                "elasticloadbalancing:DescribeListenerAttributes",
-                "elasticloadbalancing:DescribeListenerCertificates",
-                "elasticloadbalancing:DescribeRules",
-                "elasticloadbalancing:DescribeTargetGroups",
-                "elasticloadbalancing:DescribeTargetGroupAttributes",
-                "elasticloadbalancing:DescribeTargetHealth",
-                "elasticloadbalancing:DescribeTags",
-                "elasticloadbalancing:DescribeSSLPolicies",
-                "elasticloadbalancing:CreateLoadBalancer",
-                "elasticloadbalancing:CreateListener",
-                "elasticloadbalancing:CreateRule",
-                "elasticloadbalancing:CreateTargetGroup",
-                "elasticloadbalancing:ModifyLoadBalancerAttributes",
-                "elasticloadbalancing:ModifyListener",
-                "elasticloadbalancing:ModifyRule",
-                "elasticloadbalancing:ModifyTargetGroupAttributes",
-                "elasticloadbalancing:RegisterTargets",
-                "elasticloadbalancing:DeregisterTargets",
-                "elasticloadbalancing:SetWebAcl",
-                "elasticloadbalancing:SetSecurityGroups",
-                "elasticloadbalancing:SetSubnets",
-                "elasticloadbalancing:DeleteLoadBalancer",
-                "elasticloadbalancing:DeleteListener",
-                "elasticloadbalancing:DeleteRule",
-                "elasticloadbalancing:DeleteTargetGroup",
-                "elasticloadbalancing:AddTags",
-                "elasticloadbalancing:RemoveTags",
-            ],
-            resources=["*"],
-        ),
-        # WAF permissions
-        aws.iam.GetPolicyDocumentStatementArgs(
-            effect="Allow",
-            actions=[
-                "wafv2:GetWebACL",
-                "wafv2:GetWebACLForResource",
-                "wafv2:AssociateWebACL",
-                "wafv2:DisassociateWebACL",
-            ],
-            resources=["*"],
-        ),
-        # Shield permissions
-        aws.iam.GetPolicyDocumentStatementArgs(
-            effect="Allow",
-            actions=[
-                "shield:GetSubscriptionState",
-                "shield:DescribeProtection",
-                "shield:CreateProtection",
-                "shield:DeleteProtection",
-            ],
-            resources=["*"],
-        ),
-        # Cognito permissions (for ALB authentication)
-        aws.iam.GetPolicyDocumentStatementArgs(
-            effect="Allow",
-            actions=[
-                "cognito-idp:DescribeUserPoolClient",
-            ],
-            resources=["*"],
-        ),
-        # ACM permissions (for SSL certificates)
-        aws.iam.GetPolicyDocumentStatementArgs(
-            effect="Allow",
-            actions=[
-                "acm:ListCertificates",
-                "acm:DescribeCertificate",
-            ],
-            resources=["*"],
-        ),
-        # IAM permissions
-        aws.iam.GetPolicyDocumentStatementArgs(
-            effect="Allow",
-            actions=[
-                "iam:CreateServiceLinkedRole",
-                "iam:GetServerCertificate",
-                "iam:ListServerCertificates",
-            ],
-            resources=["*"],
-        ),
-    ]
-)
-
 alb_policy = aws.iam.Policy(
     f"{cluster_name}-alb-controller-policy",
-    policy=alb_policy_doc.json,
+    policy=ALB_POLICY_JSON,
     tags=common_tags,
 )
 
 # Create IAM role for ALB controller with IRSA (IAM Roles for Service Accounts)
-alb_role_assume_policy = pulumi.Output.all(oidc_provider_url, oidc_provider_arn).apply(
-    lambda args: aws.iam.get_policy_document(
-        statements=[
-            aws.iam.GetPolicyDocumentStatementArgs(
-                effect="Allow",
-                principals=[
-                    aws.iam.GetPolicyDocumentStatementPrincipalArgs(
-                        type="Federated",
-                        identifiers=[args[1]],
-                    )
-                ],
-                actions=["sts:AssumeRoleWithWebIdentity"],
-                conditions=[
-                    aws.iam.GetPolicyDocumentStatementConditionArgs(
-                        test="StringEquals",
-                        variable=f"{args[0].replace('https://', '')}:sub",
-                        values=["system:serviceaccount:kube-system:aws-load-balancer-controller"],
-                    )
-                ],
-            )
-        ]
-    ).json
-)
+# Only the OIDC URL needs rewriting (into the "<issuer host>:sub" condition
+# key); the ARN flows straight into the document
+alb_trust_condition = oidc_provider_url.apply(lambda url: {
+    f"{url.replace('https://', '')}:sub":
+        "system:serviceaccount:kube-system:aws-load-balancer-controller",
+})
+
+alb_role_assume_policy = pulumi.Output.json_dumps({
+    "Version": "2012-10-17",
+    "Statement": [{
+        "Effect": "Allow",
+        "Principal": {"Federated": oidc_provider_arn},
+        "Action": "sts:AssumeRoleWithWebIdentity",
+        "Condition": {"StringEquals": alb_trust_condition},
+    }],
+})
 
 alb_role = aws.iam.Role(
     f"{cluster_name}-alb-controller-role",
@@ -315,17 +239,14 @@ alb_role_policy_attachment = aws.iam.RolePolicyAttachment(
 # Create service account for ALB controller
 alb_service_account = k8s.core.v1.ServiceAccount(
     "aws-load-balancer-controller",
-    metadata=k8s.meta.v1.ObjectMetaArgs(
-        name="aws-load-balancer-controller",
-        namespace="kube-system",
-        annotations={
+    metadata={
+        "name": "aws-load-balancer-controller",
+        "namespace": "kube-system",
+        "annotations": {
             "eks.amazonaws.com/role-arn": alb_role.arn,
         },
-    ),
-    opts=pulumi.ResourceOptions(
-        provider=k8s_provider,
-        depends_on=[cluster],
-    ),
+    },
+    opts=k8s_opts,
 )
 
 # Install ALB controller using Helm
@@ -333,9 +254,11 @@ alb_controller = k8s.helm.v3.Release(
     "aws-load-balancer-controller",
     k8s.helm.v3.ReleaseArgs(
         chart="aws-load-balancer-controller",
-        repository_opts=k8s.helm.v3.RepositoryOptsArgs(
-            repo="https://aws.github.io/eks-charts",
-        ),
+        version=alb_chart_version,
+        skip_await=not wait_alb,
+        repository_opts={
+            "repo": "https://aws.github.io/eks-charts",
+        },
         namespace="kube-system",
         values={
             "clusterName": cluster.eks_cluster.name,
@@ -359,9 +282,9 @@ metrics_server = k8s.helm.v3.Release(
     "metrics-server",
     k8s.helm.v3.ReleaseArgs(
         chart="metrics-server",
-        repository_opts=k8s.helm.v3.RepositoryOptsArgs(
-            repo="https://kubernetes-sigs.github.io/metrics-server/",
-        ),
+        repository_opts={
+            "repo": "https://kubernetes-sigs.github.io/metrics-server/",
+        },
         namespace="kube-system",
         values={
             # Required for EKS
@@ -370,10 +293,7 @@ metrics_server = k8s.helm.v3.Release(
             ],
         },
     ),
-    opts=pulumi.ResourceOptions(
-        provider=k8s_provider,
-        depends_on=[cluster],
-    ),
+    opts=k8s_opts,
 )
 
 # Export important values
@@ -1,6 +1,8 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
+import json
 import os
 import socket
+import time
 from datetime import datetime
 
 app = Flask(__name__)
@@ -8,30 +10,58 @@ app = Flask(__name__)
 SERVICE_NAME = "Dawn"
 VERSION = "1.0.0"
 
+# Static response bodies, serialized once at import instead of per request
+HOME_JSON = json.dumps({
+    "service": SERVICE_NAME,
+    "message": "Welcome to the Dawn service",
+    "version": VERSION
+}, separators=(",", ":"))
+HEALTH_JSON = json.dumps({
+    "status": "healthy",
+    "service": SERVICE_NAME
+}, separators=(",", ":"))
+
+# Fixed for the lifetime of the pod
+HOSTNAME = socket.gethostname()
+
+# (epoch second, ISO string) of the last formatted timestamp
+_ts_cache = (0, "")
+
+def _iso_now():
+    """UTC ISO timestamp, formatted at most once per second."""
+    global _ts_cache
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache = (now, datetime.utcfromtimestamp(now).isoformat())
+    return _ts_cache[1]
+
 @app.route('/')
 def home():
-    return jsonify({
-        "service": SERVICE_NAME,
-        "message": "Welcome to the Dawn service",
-        "version": VERSION
-    })
+    return Response(HOME_JSON, mimetype="application/json")
 
 @app.route('/health')
 def health():
-    return jsonify({
-        "status": "healthy",
-        "service": SERVICE_NAME,
-        "timestamp": datetime.utcnow().isoformat()
-    })
+    # Hit by kubelet and ALB probes every few seconds: a constant 200 body,
+    # no per-request clock read or serialization
+    return Response(HEALTH_JSON, mimetype="application/json")
+
+@app.route('/healthz/detail')
+def health_detail():
+    # Human-facing variant of /health with the current timestamp
+    return Response(
+        '{"status":"healthy","service":"' + SERVICE_NAME
+        + '","timestamp":"' + _iso_now() + '"}',
+        mimetype="application/json"
+    )
 
 @app.route('/info')
 def info():
     return jsonify({
         "service": SERVICE_NAME,
         "version": VERSION,
-        "hostname": socket.gethostname(),
+        "hostname": HOSTNAME,
         "environment": os.getenv("ENVIRONMENT", "development"),
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": _iso_now()
     })
 
 if __name__ == '__main__':
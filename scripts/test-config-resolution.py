@@ -4,26 +4,51 @@ Test to see what the kubernetes:kubeconfig config actually resolves to.
 Run from: foundation/gitops/pulumi_deploy/
 """
 
+import functools
+import os
+import sys
+
 import pulumi
 
+_K8S_CFG = pulumi.Config("kubernetes")
+
+# Diagnostic per config value type. If it's a dict or string, the
+# fn::stackReference isn't being resolved
+_DIAG = {
+    dict: "⚠️  Config returned a dict - fn::stackReference NOT auto-resolved\n"
+          "    You need to use StackReference in code instead!",
+    str: "⚠️  Config returned a string - fn::stackReference NOT auto-resolved",
+    type(None): "✅ Config is None - provider will use default kubeconfig sources",
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_kubeconfig():
+    """kubernetes:kubeconfig as the program sees it, read once per process."""
+    return _K8S_CFG.get("kubeconfig")
+
+
 # Test what the config value actually is
-k8s_config = pulumi.Config("kubernetes")
-kubeconfig_value = k8s_config.get("kubeconfig")
-
-print("=" * 60)
-print("Config Resolution Test")
-print("=" * 60)
-print(f"Type: {type(kubeconfig_value)}")
-print(f"Value: {kubeconfig_value}")
-print("=" * 60)
-
-# If it's a dict or string, the fn::stackReference isn't being resolved
-if isinstance(kubeconfig_value, dict):
-    print("⚠️  Config returned a dict - fn::stackReference NOT auto-resolved")
-    print("    You need to use StackReference in code instead!")
-elif isinstance(kubeconfig_value, str):
-    print("⚠️  Config returned a string - fn::stackReference NOT auto-resolved")
-elif kubeconfig_value is None:
-    print("✅ Config is None - provider will use default kubeconfig sources")
-else:
-    print(f"🤔 Unexpected type: {type(kubeconfig_value)}")
+kubeconfig_value = _resolve_kubeconfig()
+
+RULE = "=" * 60
+
+# The value can be a full kubeconfig with embedded certificates; only show it
+# with PULUMI_TEST_VERBOSE=1, and then only the first 200 characters
+value_line = ""
+if os.environ.get("PULUMI_TEST_VERBOSE") == "1":
+    value_text = str(kubeconfig_value)
+    if len(value_text) > 200:
+        value_text = value_text[:200] + "..."
+    value_line = f"Value: {value_text}\n"
+
+sys.stdout.write(
+    f"{RULE}\n"
+    "Config Resolution Test\n"
+    f"{RULE}\n"
+    f"Type: {type(kubeconfig_value)}\n"
+    f"{value_line}"
+    f"{RULE}\n"
+)
+
+print(_DIAG.get(type(kubeconfig_value), f"🤔 Unexpected type: {type(kubeconfig_value)}"))
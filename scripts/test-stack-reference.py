@@ -8,16 +8,30 @@ Usage:
   python3 ../../../scripts/test-stack-reference.py
 """
 
+import functools
+import sys
+
 import pulumi
 
+
+@functools.lru_cache(maxsize=None)
+def _stack_ref(name):
+    """One StackReference per stack name for the life of the process."""
+    return pulumi.StackReference(name)
+
+
 # Test reading from infrastructure stack
-infra_stack = pulumi.StackReference("foundation/day")
+infra_stack = _stack_ref("foundation/day")
 
-# Try to read the kubeconfig output
-kubeconfig = infra_stack.get_output("kubeconfig")
+# Try to read the kubeconfig output (from the resolved outputs map; further
+# checks should read from it too rather than calling get_output per key)
+kubeconfig = infra_stack.outputs.apply(lambda outputs: outputs.get("kubeconfig"))
 
-# Export it to verify it works
-pulumi.export("test_kubeconfig_from_infra", kubeconfig)
+# Export whether it resolved rather than the kubeconfig itself, so the
+# (certificate-laden) payload isn't copied into this stack's outputs
+pulumi.export("test_kubeconfig_from_infra", kubeconfig.apply(lambda kc: kc is not None))
 
-print("✅ Stack reference test successful!")
-print("Run 'pulumi preview' to see if kubeconfig was retrieved")
+sys.stdout.write(
+    "✅ Stack reference test successful!\n"
+    "Run 'pulumi preview' to see if kubeconfig was retrieved\n"
+)